@@ -1,54 +1,125 @@
-from typing import Dict, Any, Generator
+from typing import Dict, Any
+import io
 import os
 import mmap
+import pickle
 import re
+import threading
 from collections import defaultdict
-from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from config import logger, LANGUAGE_CONFIGS, EXTENSION_TO_LANGUAGE
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+from config import (logger, LANGUAGE_CONFIGS, EXTENSION_TO_LANGUAGE,
+                    CATEGORY_INDEX)
+
+try:
+    # Optional: makes the per-file stats vectors and the reduce step a
+    # single C-level array add each
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    # Optional compiled hot loop; build with `python setup.py build_ext --inplace`
+    from line_counter import CyLineCounter
+except ImportError:
+    CyLineCounter = None
+
+import numba_counter
+
+try:
+    # Optional multi-pattern DFA backend for line classification
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# The two main counters that also appear in the detailed breakdown
+_DETAILED_MAIN = ('blank', 'comments')
+
+
+def zero_vector():
+    """A fresh all-zero stats vector in canonical category order"""
+    if np is not None:
+        return np.zeros(len(CATEGORY_INDEX), dtype=np.int64)
+    return [0] * len(CATEGORY_INDEX)
+
+
+def stats_to_vector(stats: Dict):
+    """Flatten a LineCounter stats dict into a fixed-length vector"""
+    vector = zero_vector()
+    vector[CATEGORY_INDEX['blank']] = stats['blank']
+    vector[CATEGORY_INDEX['comments']] = stats['comments']
+    vector[CATEGORY_INDEX['code']] = stats['code']
+    vector[CATEGORY_INDEX['total']] = stats['total']
+    for category, count in stats['detailed'].items():
+        if category not in _DETAILED_MAIN:
+            vector[CATEGORY_INDEX[category]] = count
+    return vector
+
+
+def vector_to_stats(vector) -> Dict:
+    """Expand a stats vector back into the reporting dict shape"""
+    stats = {
+        'blank': int(vector[CATEGORY_INDEX['blank']]),
+        'comments': int(vector[CATEGORY_INDEX['comments']]),
+        'code': int(vector[CATEGORY_INDEX['code']]),
+        'total': int(vector[CATEGORY_INDEX['total']]),
+        'detailed': {}
+    }
+    detailed = stats['detailed']
+    for category, index in CATEGORY_INDEX.items():
+        if category in ('code', 'total'):
+            continue
+        count = int(vector[index])
+        if count:
+            detailed[category] = count
+    return stats
+
+
+def _add_vector(total, vector) -> None:
+    """In-place element-wise add; a single SIMD add under numpy"""
+    if np is not None:
+        total += vector
+    else:
+        for index, count in enumerate(vector):
+            total[index] += count
+
+
+def _advise_sequential(mm: mmap.mmap) -> None:
+    """Hint the kernel that the mapping will be scanned front to back"""
+    try:
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+        mm.madvise(mmap.MADV_WILLNEED)
+    except (AttributeError, OSError):
+        pass
+
+
+def _advise_done(mm: mmap.mmap) -> None:
+    """Let the kernel drop the mapping's pages once the scan is over"""
+    try:
+        mm.madvise(mmap.MADV_DONTNEED)
+    except (AttributeError, OSError):
+        pass
+
 
 class ChunkProcessor:
-    """Handles the processing of large file chunks"""
-    
-    CHUNK_SIZE = 1024 * 1024  # 1MB chunks
-    
+    """Handles raw file reading for the counters"""
+
     @staticmethod
-    def get_file_chunks(file_path: str, chunk_size: int = CHUNK_SIZE) -> Generator[str, None, None]:
-        """Generator that yields chunks of a file"""
+    def read_small_file(file_path: str) -> str:
+        """Read a small file with a single read syscall, bypassing buffered IO"""
+        fd = os.open(file_path, os.O_RDONLY)
         try:
-            with open(file_path, 'rb') as f:
-                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                    buffer = ""
-                    total_size = mm.size()
-                    processed = 0
-                    
-                    while processed < total_size:
-                        chunk = mm.read(chunk_size)
-                        processed += len(chunk)
-                        
-                        if not chunk:
-                            break
-                            
-                        text = chunk.decode('utf-8', errors='replace')
-                        lines = (buffer + text).split('\n')
-                        
-                        if text:
-                            buffer = lines[-1]
-                            lines = lines[:-1]
-                        
-                        for line in lines:
-                            yield line + '\n'
-                    
-                    if buffer:
-                        yield buffer
-        except Exception as e:
-            logger.error(f"Error reading file chunks: {str(e)}")
-            raise
+            data = os.read(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        return data.decode('utf-8')
 
 class FileProcessor:
     """Handles file size checks and processing decisions"""
     
-    LARGE_FILE_THRESHOLD = 10 * 1024 * 1024  # 10MB
+    # Break-even point where mmap setup cost pays for itself; files at or
+    # below this are read whole with a single syscall instead
+    LARGE_FILE_THRESHOLD = 64 * 4096  # 256KB
     
     @staticmethod
     def is_large_file(file_path: str) -> bool:
@@ -70,17 +141,74 @@ class LineClassifier:
     """Helper class to classify different types of code lines"""
     
     def __init__(self, language_config: Dict[str, Any]):
-        self.patterns = {
-            category: re.compile(pattern)
+        # `.match` anchors already, so the leading ^ in the configs is
+        # redundant; re.ASCII keeps \w/\s out of the Unicode tables, which
+        # is correct for these keyword patterns and faster per character
+        patterns = {
+            category: pattern.lstrip('^')
             for category, pattern in language_config.get('patterns', {}).items()
         }
-    
-    def classify_line(self, line: str) -> str:
-        for category, pattern in self.patterns.items():
-            if pattern.match(line):
-                return category
+        self.patterns = {
+            category: re.compile(pattern, re.ASCII)
+            for category, pattern in patterns.items()
+        }
+        # Fuse all category patterns into one alternation so a line is
+        # classified with a single regex call instead of one per category
+        combined = '|'.join(
+            f'(?P<{category}>{pattern})'
+            for category, pattern in patterns.items()
+        )
+        self.combined = re.compile(combined, re.ASCII) if patterns else None
+        # Bytes twin so the mmap scan can classify without decoding
+        self.combined_bytes = (re.compile(combined.encode('ascii'))
+                               if patterns else None)
+        self.categories = list(patterns)
+        self.hs_db = None
+        self._hs_matches = []
+        if hyperscan is not None and patterns:
+            try:
+                db = hyperscan.Database()
+                # `.match` anchors implicitly, so anchor explicitly for the DFA
+                expressions = [
+                    (p if p.startswith('^') else '^' + p).encode()
+                    for p in patterns.values()
+                ]
+                db.compile(
+                    expressions=expressions,
+                    ids=list(range(len(expressions))),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+                )
+                self.hs_db = db
+            except Exception as e:
+                logger.warning(f"Hyperscan backend disabled: {str(e)}")
+
+    def _on_hs_match(self, pattern_id, start, end, flags, context):
+        self._hs_matches.append(pattern_id)
+
+    def _scan_bytes(self, data: bytes) -> str:
+        self._hs_matches.clear()
+        self.hs_db.scan(data, match_event_handler=self._on_hs_match)
+        if self._hs_matches:
+            # Lowest id mirrors the alternation's first-pattern-wins order
+            return self.categories[min(self._hs_matches)]
         return 'other_code'
 
+    def classify_line(self, line: str) -> str:
+        if self.hs_db is not None:
+            return self._scan_bytes(line.encode('utf-8', errors='replace'))
+        if self.combined is None:
+            return 'other_code'
+        match = self.combined.match(line)
+        return match.lastgroup if match else 'other_code'
+
+    def classify_line_bytes(self, line: bytes) -> str:
+        if self.hs_db is not None:
+            return self._scan_bytes(line)
+        if self.combined_bytes is None:
+            return 'other_code'
+        match = self.combined_bytes.match(line)
+        return match.lastgroup if match else 'other_code'
+
 class LineCounter:
     """Counts and categorizes lines in source code files"""
     
@@ -88,6 +216,19 @@ class LineCounter:
         self.config = language_config
         self.classifier = LineClassifier(language_config)
         self.chunk_processor = ChunkProcessor()
+        # Comment markers baked into flat tuples so the hot path does one
+        # attribute load per line instead of repeated config dict lookups
+        self.sl_comments = tuple(language_config['single_line_comments'])
+        self.ml_comments = tuple(
+            (start, end) for start, end in language_config['multi_line_comments'])
+        # Byte twins of the markers for the undecoded mmap scan
+        self._sl_bytes = tuple(marker.encode() for marker in self.sl_comments)
+        self._ml_bytes = tuple(
+            (start.encode(), end.encode()) for start, end in self.ml_comments)
+        # Compiled hot loop, built once so its patterns compile once per
+        # counter rather than once per file
+        self._cy = (CyLineCounter(language_config)
+                    if CyLineCounter is not None else None)
         self.reset_counters()
 
     def reset_counters(self) -> None:
@@ -105,13 +246,12 @@ class LineCounter:
         return not line.strip()
 
     def is_single_line_comment(self, line: str) -> bool:
-        stripped_line = line.strip()
-        return any(stripped_line.startswith(comment) 
-                  for comment in self.config['single_line_comments'])
+        # startswith takes the marker tuple natively, one C call
+        return line.lstrip().startswith(self.sl_comments)
 
     def check_multi_line_comment(self, line: str) -> bool:
         if not self.in_multi_line_comment:
-            for start, end in self.config['multi_line_comments']:
+            for start, end in self.ml_comments:
                 if start in line:
                     if end in line[line.index(start) + len(start):]:
                         return len(line[:line.index(start)].strip()) == 0
@@ -127,137 +267,301 @@ class LineCounter:
 
     def process_line(self, line: str) -> None:
         """
-        Process a single line and update counters.
+        Process a single line and update counters in one pass.
         Code lines include everything except blanks and comments.
         """
-        if self.is_blank_line(line):
+        stripped = line.strip()
+        if not stripped:
             self.stats['blank'] += 1
             self.stats['detailed']['blank'] += 1
-        elif self.is_single_line_comment(line) or self.check_multi_line_comment(line):
+        elif self.in_multi_line_comment:
+            if self.current_multi_line_comment[1] in line:
+                self.in_multi_line_comment = False
+                self.current_multi_line_comment = None
+            self.stats['comments'] += 1
+            self.stats['detailed']['comments'] += 1
+        elif (stripped.startswith(self.sl_comments)
+              or self.check_multi_line_comment(line)):
             self.stats['comments'] += 1
             self.stats['detailed']['comments'] += 1
         else:
-            # This is a code line - classify it for detailed stats
-            self.stats['code'] += 1  # Increment total code counter
-            
-            # Also classify it into specific categories for detailed breakdown
-            matched = False
-            for category, pattern in self.classifier.patterns.items():
-                if pattern.match(line):
-                    self.stats['detailed'][category] += 1
-                    matched = True
-                    break
-            
-            # If no specific pattern matched, it's still code
-            if not matched:
-                self.stats['detailed']['other_code'] += 1
-        
+            # This is a code line - classify it exactly once and reuse the
+            # result for both the code counter and the detailed breakdown
+            category = self.classifier.classify_line(line)
+            self.stats['code'] += 1
+            self.stats['detailed'][category] += 1
+
         self.stats['total'] += 1
 
-    def count_lines(self, filename: str) -> Dict[str, int]:
-        """Enhanced line counting with large file support"""
+    def count_lines(self, filename: str, file_size: int = None) -> Dict[str, int]:
+        """Enhanced line counting with large file support.
+
+        Callers that already stat'ed the file pass file_size in so the
+        size check costs no extra syscall.
+        """
         try:
             self.reset_counters()
-            file_size_mb = FileProcessor.get_file_size_mb(filename)
-            
-            logger.info(f"Processing file: {filename} ({file_size_mb:.2f} MB)")
-            
-            if FileProcessor.is_large_file(filename):
-                logger.info(f"Using chunk processing for large file: {filename}")
-                for line in self.chunk_processor.get_file_chunks(filename):
-                    self.process_line(line)
-            else:
-                with open(filename, 'r', encoding='utf-8') as file:
-                    for line in file:
-                        self.process_line(line)
-                        
-            return self.stats
+            if file_size is None:
+                try:
+                    file_size = os.path.getsize(filename)
+                except OSError:
+                    file_size = 0
+
+            logger.info(f"Processing file: {filename} "
+                        f"({file_size / (1024 * 1024):.2f} MB)")
+
+            if file_size > FileProcessor.LARGE_FILE_THRESHOLD:
+                if numba_counter.supports(self.config):
+                    logger.info(f"Using JIT buffer scan for large file: {filename}")
+                    with open(filename, 'rb') as f:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            _advise_sequential(mm)
+                            self.stats = numba_counter.count_buffer(mm, self.config)
+                            _advise_done(mm)
+                    return self.stats
+                logger.info(f"Using mmap scan for large file: {filename}")
+                with open(filename, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        _advise_sequential(mm)
+                        self.count_mmap(mm)
+                        _advise_done(mm)
+                return self.stats
+
+            # Iterate via StringIO rather than splitlines: splitlines also
+            # breaks on form feeds and other exotic separators, which would
+            # make counts disagree with the newline-delimited mmap scan
+            text = self.chunk_processor.read_small_file(filename)
+            return self._count(io.StringIO(text))
                 
         except Exception as e:
             logger.error(f"Error processing file {filename}: {str(e)}")
             return None
 
+    def count_mmap(self, mm: mmap.mmap) -> Dict[str, int]:
+        """Count straight off an mmap buffer in one pass.
+
+        The whole scan, classification included, runs on the raw bytes;
+        nothing is decoded to str.
+        """
+        blank = comments = code = total = 0
+        category_counts = defaultdict(int)
+        classify = self.classifier.classify_line_bytes
+        sl_markers = self._sl_bytes
+        ml_markers = self._ml_bytes
+        in_comment = False
+        end_marker = b''
+
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            newline = mm.find(b'\n', pos)
+            end = size if newline < 0 else newline
+            line = mm[pos:end]
+            pos = end + 1
+            total += 1
+
+            stripped = line.strip()
+            if not stripped:
+                blank += 1
+            elif in_comment:
+                if end_marker in line:
+                    in_comment = False
+                comments += 1
+            else:
+                is_comment = stripped.startswith(sl_markers)
+                if not is_comment:
+                    for start, end_bytes in ml_markers:
+                        idx = line.find(start)
+                        if idx >= 0:
+                            if end_bytes in line[idx + len(start):]:
+                                is_comment = not line[:idx].strip()
+                            else:
+                                in_comment = True
+                                end_marker = end_bytes
+                                is_comment = True
+                            break
+                if is_comment:
+                    comments += 1
+                else:
+                    code += 1
+                    category_counts[classify(line)] += 1
+
+        self._flush_counts(blank, comments, code, total, category_counts)
+        return self.stats
+
+    def _count(self, lines) -> Dict[str, int]:
+        """Run the counting loop, using the Cython extension when built.
+
+        The pure-Python loop keeps its counters in locals (LOAD_FAST
+        instead of attribute + subscript per line) and writes them back
+        to the stats dict once at the end.
+        """
+        if self._cy is not None:
+            self._cy.reset()
+            self.stats = self._cy.count(lines)
+            return self.stats
+
+        blank = comments = code = total = 0
+        category_counts = defaultdict(int)
+        classify = self.classifier.classify_line
+        sl_markers = self.sl_comments
+        check_multi = self.check_multi_line_comment
+
+        for line in lines:
+            total += 1
+            stripped = line.strip()
+            if not stripped:
+                blank += 1
+            elif self.in_multi_line_comment:
+                if self.current_multi_line_comment[1] in line:
+                    self.in_multi_line_comment = False
+                    self.current_multi_line_comment = None
+                comments += 1
+            elif stripped.startswith(sl_markers) or check_multi(line):
+                comments += 1
+            else:
+                code += 1
+                category_counts[classify(line)] += 1
+
+        self._flush_counts(blank, comments, code, total, category_counts)
+        return self.stats
+
+    def _flush_counts(self, blank, comments, code, total, category_counts) -> None:
+        """Write the loop-local counters back to the stats dict"""
+        self.stats['blank'] = blank
+        self.stats['comments'] = comments
+        self.stats['code'] = code
+        self.stats['total'] = total
+        detailed = self.stats['detailed']
+        if blank:
+            detailed['blank'] = blank
+        if comments:
+            detailed['comments'] = comments
+        for category, count in category_counts.items():
+            detailed[category] = count
+
+def collect_source_files(directory: str) -> list:
+    """Walk a tree with scandir and return (path, size) for supported files.
+
+    DirEntry carries cached stat info, so this costs about one stat per
+    file instead of the two paid by rglob plus os.path.getsize.
+    """
+    collected = []
+
+    def _walk(root):
+        try:
+            entries = os.scandir(root)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {root}: {str(e)}")
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        _walk(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if ext in EXTENSION_TO_LANGUAGE:
+                            collected.append((entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+
+    _walk(directory)
+    return collected
+
+
 class SourceTreeAnalyzer:
     """Analyzes entire directory trees with parallel processing support"""
-    
+
+    # Files at or below this run batched; bigger ones get their own task
+    BATCH_FILE_LIMIT = 1024 * 1024  # 1MB
+    # Target cumulative size of one batch task
+    BATCH_TARGET_SIZE = 4 * 1024 * 1024  # 4MB
+
     def __init__(self):
         self.file_count = defaultdict(int)
         self.file_details = defaultdict(list)
-        self.total_stats = defaultdict(lambda: {
-            'blank': 0,
-            'comments': 0,
-            'code': 0,
-            'total': 0,
-            'detailed': defaultdict(int)
-        })
+        # Plain dict (not defaultdict with a lambda) so totals stay picklable
+        self.total_stats = {}
         self.max_workers = os.cpu_count() or 1
 
-    def analyze_directory(self, directory: str) -> Dict:
-        directory_path = Path(directory)
-        files_to_process = []
-        total_size = 0
-        
-        # Collect files and calculate total size
-        for file_path in directory_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in EXTENSION_TO_LANGUAGE:
-                files_to_process.append(str(file_path))
-                total_size += os.path.getsize(file_path)
-        
+    def analyze_directory(self, directory: str, files_to_process: list = None) -> Dict:
+        # Callers that already walked the tree (e.g. main's pre-count) pass
+        # their (path, size) list in so the directory is traversed only once
+        if files_to_process is None:
+            files_to_process = collect_source_files(directory)
+        total_size = sum(size for _, size in files_to_process)
+
         logger.info(f"Found {len(files_to_process)} files to process "
                    f"(Total size: {total_size / (1024*1024):.2f} MB)")
-        
-        # Process files in parallel with size-based batching
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+
+        # Largest files first so stragglers start early
+        files_to_process.sort(key=lambda item: item[1], reverse=True)
+
+        # Process files in parallel with size-based batching: big files get
+        # their own task, small files are grouped so one task amortizes the
+        # submit/pickle overhead over many files
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=_init_worker) as executor:
             futures = []
-            for file_path in files_to_process:
-                if FileProcessor.is_large_file(file_path):
+            batch = []
+            batch_size = 0
+            for file_path, size in files_to_process:
+                if size > self.BATCH_FILE_LIMIT:
                     futures.append(executor.submit(process_file, file_path))
-                else:
-                    futures.append(executor.submit(process_file, file_path))
-            
+                    continue
+                batch.append(file_path)
+                batch_size += size
+                if batch_size >= self.BATCH_TARGET_SIZE:
+                    futures.append(executor.submit(process_file_batch, batch))
+                    batch = []
+                    batch_size = 0
+            if batch:
+                futures.append(executor.submit(process_file_batch, batch))
+
             # Process results as they complete
             for future in as_completed(futures):
                 try:
-                    result = future.result()
-                    if result:
-                        self.update_totals(result)
-                        self.file_details[result['language']].append(result)
+                    results = future.result()
+                    if not isinstance(results, list):
+                        results = [results]
+                    for result in results:
+                        if result:
+                            self.update_totals(result)
+                            self.file_details[result['language']].append(result)
+                            store_cached_result(result)
                 except Exception as e:
                     logger.error(f"Error processing file: {str(e)}")
+
+        save_result_cache()
         
         return self.get_summary()
 
     def update_totals(self, result: Dict) -> None:
         language = result['language']
         self.file_count[language] += 1
-        
-        # Update main statistics
-        self.total_stats[language]['blank'] += result['stats']['blank']
-        self.total_stats[language]['comments'] += result['stats']['comments']
-        self.total_stats[language]['code'] += result['stats']['code']
-        self.total_stats[language]['total'] += result['stats']['total']
-        
-        # Update detailed statistics
-        for category, count in result['stats']['detailed'].items():
-            self.total_stats[language]['detailed'][category] += count
+
+        entry = self.total_stats.get(language)
+        if entry is None:
+            entry = self.total_stats.setdefault(language, zero_vector())
+        _add_vector(entry, result['stats'])
 
     def get_summary(self) -> Dict:
+        # Vectors are expanded back into dicts only here, at the boundary
+        # between counting and reporting
         return {
             'by_language': {
                 language: {
                     'file_count': self.file_count[language],
-                    'statistics': {
-                        'blank': self.total_stats[language]['blank'],
-                        'comments': self.total_stats[language]['comments'],
-                        'code': self.total_stats[language]['code'],
-                        'total': self.total_stats[language]['total'],
-                        'detailed': dict(self.total_stats[language]['detailed'])
-                    },
-                    'files': sorted(
-                        self.file_details[language],
-                        key=lambda x: os.path.getsize(x['filename']),
-                        reverse=True
-                    )
+                    'statistics': vector_to_stats(self.total_stats[language]),
+                    'files': [
+                        dict(result, stats=vector_to_stats(result['stats']))
+                        for result in sorted(
+                            self.file_details[language],
+                            key=lambda x: x.get('size', 0),
+                            reverse=True
+                        )
+                    ]
                 }
                 for language, _ in self.file_count.items()
             },
@@ -265,6 +569,107 @@ class SourceTreeAnalyzer:
         }
 
 
+# Persistent per-file result cache keyed by (abs path, mtime_ns, size), so
+# re-running the analyzer only recomputes files that actually changed
+_RESULT_CACHE = None
+
+# Bumped whenever the cached result schema changes; entries from other
+# formats are discarded on load
+_CACHE_FORMAT = 2
+
+
+def _cache_format() -> tuple:
+    """Schema version plus vector layout; stale vectors from a config with
+    different categories must not survive into _add_vector"""
+    return (_CACHE_FORMAT, tuple(CATEGORY_INDEX))
+
+
+def _result_cache_path() -> str:
+    return os.path.join(os.path.expanduser('~'), '.cache', 'code-analyser',
+                        'results.pkl')
+
+
+def _get_result_cache() -> dict:
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None:
+        try:
+            with open(_result_cache_path(), 'rb') as f:
+                _RESULT_CACHE = pickle.load(f)
+        except Exception:
+            # Unpickling runs arbitrary reconstructors (cached vectors may
+            # be numpy arrays from another environment); any failure just
+            # means recomputing, never erroring out per file
+            _RESULT_CACHE = {}
+        if _RESULT_CACHE.get('__format__') != _cache_format():
+            _RESULT_CACHE = {'__format__': _cache_format()}
+    return _RESULT_CACHE
+
+
+def store_cached_result(result: Dict) -> None:
+    """Record a result in the in-memory cache of the current process.
+
+    Worker-side stores die with the worker; the parent calls this for
+    every result it collects and then persists with save_result_cache.
+    """
+    try:
+        st = os.stat(result['filename'])
+    except OSError:
+        return
+    key = (os.path.abspath(result['filename']), st.st_mtime_ns, st.st_size)
+    _get_result_cache()[key] = result
+
+
+def save_result_cache() -> None:
+    """Persist this process's result cache atomically"""
+    if _RESULT_CACHE is None:
+        return
+    cache_path = _result_cache_path()
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(_RESULT_CACHE, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not save result cache: {str(e)}")
+
+
+# Per-thread LineCounter cache: counters carry per-file state, so batch
+# threads each get their own set while still reusing them across files
+_THREAD_COUNTERS = threading.local()
+
+# Threads used to overlap file I/O with counting inside one batch task
+BATCH_IO_THREADS = 4
+
+# Lazily created, worker-lifetime thread pool so batch threads (and their
+# cached counters) persist across batch tasks
+_BATCH_POOL = None
+
+
+def _init_worker() -> None:
+    _THREAD_COUNTERS.counters = {
+        language: LineCounter(config)
+        for language, config in LANGUAGE_CONFIGS.items()
+    }
+
+
+def _get_counter(language_id: str) -> 'LineCounter':
+    counters = getattr(_THREAD_COUNTERS, 'counters', None)
+    if counters is None:
+        counters = _THREAD_COUNTERS.counters = {}
+    counter = counters.get(language_id)
+    if counter is None:
+        counter = counters[language_id] = LineCounter(LANGUAGE_CONFIGS[language_id])
+    return counter
+
+
+def _get_batch_pool() -> ThreadPoolExecutor:
+    global _BATCH_POOL
+    if _BATCH_POOL is None:
+        _BATCH_POOL = ThreadPoolExecutor(max_workers=BATCH_IO_THREADS)
+    return _BATCH_POOL
+
+
 def process_file(filename: str) -> Dict[str, Any]:
     """Process a single file with enhanced error handling"""
     try:
@@ -275,16 +680,36 @@ def process_file(filename: str) -> Dict[str, Any]:
             logger.warning(f"Unsupported file type for {filename}")
             return None
 
+        st = os.stat(filename)
+        cached = _get_result_cache().get(
+            (os.path.abspath(filename), st.st_mtime_ns, st.st_size))
+        if cached is not None:
+            return cached
+
         language_config = LANGUAGE_CONFIGS[language_id]
-        counter = LineCounter(language_config)
-        results = counter.count_lines(filename)
-        
+        counter = _get_counter(language_id)
+        results = counter.count_lines(filename, st.st_size)
+
         if results:
             return {
                 'filename': filename,
                 'language': language_config['name'],
-                'stats': results
+                'size': st.st_size,
+                'stats': stats_to_vector(results)
             }
     except Exception as e:
         logger.error(f"Error processing {filename}: {str(e)}")
     return None
+
+
+def process_file_batch(filenames) -> list:
+    """Process a batch of small files inside a single worker task.
+
+    A small thread pool overlaps file reads with counting, since the GIL
+    is released while blocking on I/O.
+    """
+    if len(filenames) == 1:
+        result = process_file(filenames[0])
+        return [result] if result else []
+    pool = _get_batch_pool()
+    return [result for result in pool.map(process_file, filenames) if result]
@@ -55,6 +55,15 @@ LANGUAGE_CONFIGS = {
     }
 }
 
+# Canonical slot assignment for the fixed-length stats vectors exchanged
+# between workers and the reduce step; derived from the configs so new
+# pattern categories get a slot automatically
+CATEGORY_INDEX = {'blank': 0, 'comments': 1, 'code': 2, 'total': 3}
+for _config in LANGUAGE_CONFIGS.values():
+    for _category in _config['patterns']:
+        CATEGORY_INDEX.setdefault(_category, len(CATEGORY_INDEX))
+CATEGORY_INDEX.setdefault('other_code', len(CATEGORY_INDEX))
+
 # Pre-computed mapping of file extensions to programming languages
 EXTENSION_TO_LANGUAGE = {
     '.py': 'python',
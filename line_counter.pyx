@@ -0,0 +1,104 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Cython port of the hot per-line counting loop.
+
+Build in place with ``python setup.py build_ext --inplace``.
+``analyzers.LineCounter`` delegates to ``CyLineCounter`` when the
+compiled extension is importable and falls back to the pure-Python
+loop otherwise, so the extension is strictly optional.
+"""
+import re
+
+cimport cython
+
+
+cdef class CyLineCounter:
+    """Typed counterpart of analyzers.LineCounter's counting loop"""
+
+    cdef long blank, comments, code, total
+    cdef dict detailed
+    cdef tuple sl_comments
+    cdef tuple ml_comments
+    cdef object combined
+    cdef bint in_multi_line_comment
+    cdef str multi_line_end
+
+    def __init__(self, dict language_config):
+        patterns = {
+            category: pattern.lstrip('^')
+            for category, pattern in language_config.get('patterns', {}).items()
+        }
+        self.combined = re.compile('|'.join(
+            f'(?P<{category}>{pattern})'
+            for category, pattern in patterns.items()
+        ), re.ASCII) if patterns else None
+        self.sl_comments = tuple(language_config['single_line_comments'])
+        self.ml_comments = tuple(
+            (start, end) for start, end in language_config['multi_line_comments']
+        )
+        self.reset()
+
+    cpdef reset(self):
+        self.blank = 0
+        self.comments = 0
+        self.code = 0
+        self.total = 0
+        self.detailed = {}
+        self.in_multi_line_comment = False
+        self.multi_line_end = None
+
+    cdef bint _check_multi_line_comment(self, str line):
+        cdef str start, end
+        cdef Py_ssize_t idx
+        if not self.in_multi_line_comment:
+            for start, end in self.ml_comments:
+                idx = line.find(start)
+                if idx >= 0:
+                    if end in line[idx + len(start):]:
+                        return len(line[:idx].strip()) == 0
+                    self.in_multi_line_comment = True
+                    self.multi_line_end = end
+                    return True
+        else:
+            if self.multi_line_end in line:
+                self.in_multi_line_comment = False
+                self.multi_line_end = None
+            return True
+        return False
+
+    cpdef process_line(self, str line):
+        cdef str stripped = line.strip()
+        cdef str category
+        if not stripped:
+            self.blank += 1
+            category = 'blank'
+        elif self.in_multi_line_comment:
+            if self.multi_line_end in line:
+                self.in_multi_line_comment = False
+                self.multi_line_end = None
+            self.comments += 1
+            category = 'comments'
+        elif stripped.startswith(self.sl_comments) or self._check_multi_line_comment(line):
+            self.comments += 1
+            category = 'comments'
+        else:
+            match = self.combined.match(line) if self.combined is not None else None
+            category = match.lastgroup if match is not None and match.lastgroup is not None else 'other_code'
+            self.code += 1
+        self.detailed[category] = self.detailed.get(category, 0) + 1
+        self.total += 1
+
+    cpdef dict count(self, lines):
+        """Consume an iterable of lines and return the stats dict"""
+        cdef str line
+        for line in lines:
+            self.process_line(line)
+        return self.stats()
+
+    cpdef dict stats(self):
+        return {
+            'blank': self.blank,
+            'comments': self.comments,
+            'code': self.code,
+            'total': self.total,
+            'detailed': self.detailed,
+        }
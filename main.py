@@ -1,9 +1,12 @@
 from typing import Dict, Any, List
+import sys
 import time
 import os
 from pathlib import Path
-from config import logger, EXTENSION_TO_LANGUAGE
-from analyzers import process_file, SourceTreeAnalyzer, FileProcessor
+from config import logger
+from analyzers import (process_file, SourceTreeAnalyzer, FileProcessor,
+                       collect_source_files, store_cached_result,
+                       save_result_cache, vector_to_stats)
 
 def format_size(size_bytes: int) -> str:
     """Convert bytes to human readable format"""
@@ -14,16 +17,17 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes:.2f} TB"
 
 def print_detailed_results(summary: Dict):
-    """Print detailed analysis results"""
-    print("\nSource Tree Analysis Summary")
-    print("=" * 80)
-    
-    print(f"Total Files Analyzed: {summary['total_files']}")
+    """Print detailed analysis results with a single buffered write"""
+    out = []
+    out.append("\nSource Tree Analysis Summary\n")
+    out.append("=" * 80 + "\n")
+
+    out.append(f"Total Files Analyzed: {summary['total_files']}\n")
     total_size = 0
-    
+
     # Main categories to always display first
     main_categories = ['blank', 'comments', 'code']
-    
+
     # Detailed code breakdown categories
     code_breakdown_categories = [
         'import',
@@ -32,56 +36,58 @@ def print_detailed_results(summary: Dict):
         'variable_declaration',
         'other_code'
     ]
-    
+
     for language, data in summary['by_language'].items():
-        print(f"\n{language} Summary:")
-        print("=" * 40)
-        print(f"Total Files: {data['file_count']}")
-        
-        # Print language-level statistics
-        print("\nLanguage-wide Statistics:")
-        print("-" * 30)
-        
-        # Print main categories first
+        out.append(f"\n{language} Summary:\n")
+        out.append("=" * 40 + "\n")
+        out.append(f"Total Files: {data['file_count']}\n")
+
+        # Language-level statistics
+        out.append("\nLanguage-wide Statistics:\n")
+        out.append("-" * 30 + "\n")
+
+        # Main categories first
         stats = data['statistics']
         for category in main_categories:
             count = stats.get(category, 0)
-            print(f"{category.replace('_', ' ').title()}: {count}")
-        
-        # Print code breakdown
-        print("\nCode Breakdown:")
-        print("-" * 20)
+            out.append(f"{category.replace('_', ' ').title()}: {count}\n")
+
+        # Code breakdown
+        out.append("\nCode Breakdown:\n")
+        out.append("-" * 20 + "\n")
         for category in code_breakdown_categories:
             count = stats['detailed'].get(category, 0)
-            print(f"{category.replace('_', ' ').title()}: {count}")
-        
-        # Print individual file statistics
-        print(f"\nIndividual File Details for {language}:")
-        print("-" * 60)
-        
+            out.append(f"{category.replace('_', ' ').title()}: {count}\n")
+
+        # Individual file statistics
+        out.append(f"\nIndividual File Details for {language}:\n")
+        out.append("-" * 60 + "\n")
+
         for file_data in data['files']:
-            file_size = os.path.getsize(file_data['filename'])
+            # Sizes were cached at processing time; no stat per file here
+            file_size = file_data.get('size', 0)
             total_size += file_size
-            
-            print(f"\nFile: {os.path.basename(file_data['filename'])}")
-            print(f"Path: {file_data['filename']}")
-            print(f"Size: {format_size(file_size)}")
-            
-            # Print main categories
+
+            out.append(f"\nFile: {os.path.basename(file_data['filename'])}\n")
+            out.append(f"Path: {file_data['filename']}\n")
+            out.append(f"Size: {format_size(file_size)}\n")
+
+            # Main categories
             for category in main_categories:
                 count = file_data['stats'].get(category, 0)
-                print(f"  {category.replace('_', ' ').title()}: {count}")
-            
-            # Print code breakdown
-            print("  Code Breakdown:")
+                out.append(f"  {category.replace('_', ' ').title()}: {count}\n")
+
+            # Code breakdown
+            out.append("  Code Breakdown:\n")
             for category in code_breakdown_categories:
                 count = file_data['stats']['detailed'].get(category, 0)
-                print(f"    {category.replace('_', ' ').title()}: {count}")
-            
-            print(f"  Total Lines: {file_data['stats']['total']}")
-            print("-" * 30)
-    
-    print(f"\nTotal Size Processed: {format_size(total_size)}")
+                out.append(f"    {category.replace('_', ' ').title()}: {count}\n")
+
+            out.append(f"  Total Lines: {file_data['stats']['total']}\n")
+            out.append("-" * 30 + "\n")
+
+    out.append(f"\nTotal Size Processed: {format_size(total_size)}\n")
+    sys.stdout.write(''.join(out))
 
 def main():
     """Enhanced main program with better resource handling"""
@@ -102,35 +108,29 @@ def main():
                 
                 result = process_file(str(path))
                 if result:
+                    store_cached_result(result)
+                    save_result_cache()
+                    stats = vector_to_stats(result['stats'])
                     print_detailed_results({
                         'total_files': 1,
                         'by_language': {
                             result['language']: {
                                 'file_count': 1,
-                                'statistics': {
-                                    'blank': result['stats']['blank'],
-                                    'comments': result['stats']['comments'],
-                                    'code': result['stats']['code'],
-                                    'detailed': result['stats']['detailed']
-                                },
-                                'files': [result]
+                                'statistics': stats,
+                                'files': [dict(result, stats=stats)]
                             }
                         }
                     })
             elif path.is_dir():
-                # Count files and total size before processing
-                file_count = 0
-                total_size = 0
-                for file_path in path.rglob('*'):
-                    if file_path.is_file() and file_path.suffix.lower() in EXTENSION_TO_LANGUAGE:
-                        file_count += 1
-                        total_size += os.path.getsize(file_path)
-                
-                logger.info(f"Found {file_count} files to process "
+                # Walk the tree once and reuse the listing for the analysis
+                files_to_process = collect_source_files(str(path))
+                total_size = sum(size for _, size in files_to_process)
+
+                logger.info(f"Found {len(files_to_process)} files to process "
                            f"(Total size: {format_size(total_size)})")
-                
+
                 analyzer = SourceTreeAnalyzer()
-                summary = analyzer.analyze_directory(str(path))
+                summary = analyzer.analyze_directory(str(path), files_to_process)
                 print_detailed_results(summary)
             else:
                 print("Invalid path!")
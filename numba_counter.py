@@ -0,0 +1,265 @@
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+# Byte prefixes equivalent to the classification regexes, per language name.
+# Each entry is (keyword, category, allow_leading_whitespace) and the kernel
+# additionally requires whitespace plus a word character after the keyword,
+# matching the `keyword\s+\w+` shape of the regexes. Languages whose patterns
+# cannot be expressed this way (e.g. Java's modifier-heavy declarations) are
+# simply absent and keep using the regex path.
+_LANGUAGE_PREFIXES = {
+    'Python': (
+        (b'import', 'import', False),
+        (b'class', 'class_definition', True),
+        (b'def', 'function_definition', True),
+    ),
+}
+
+# Languages above where the kernel's `from \w+ import \w+` scan stands in
+# for the optional from-clause of the import regex; maps to its category
+_FROM_IMPORT_LANGUAGES = {'Python': 'import'}
+
+# Languages above where `identifier =` detection stands in for the
+# variable_declaration regex
+_VARIABLE_SCAN_LANGUAGES = {'Python'}
+
+_TABLE_CACHE: Dict[str, Tuple] = {}
+
+
+def supports(language_config: Dict[str, Any]) -> bool:
+    """Whether the JIT fast path can handle this language's config"""
+    return njit is not None and language_config['name'] in _LANGUAGE_PREFIXES
+
+
+def _pad(markers) -> Tuple:
+    """Pack byte strings into a padded 2D uint8 array plus a length vector"""
+    width = max((len(m) for m in markers), default=1)
+    table = np.zeros((len(markers), width), dtype=np.uint8)
+    lengths = np.zeros(len(markers), dtype=np.int64)
+    for i, marker in enumerate(markers):
+        table[i, :len(marker)] = np.frombuffer(marker, dtype=np.uint8)
+        lengths[i] = len(marker)
+    return table, lengths
+
+
+def _is_space(c):
+    return c == 32 or c == 9 or c == 13 or c == 10 or c == 11 or c == 12
+
+
+def _is_word(c):
+    return ((48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122)
+            or c == 95)
+
+
+def _matches_at(buf, pos, end, marker, length):
+    if pos + length > end:
+        return False
+    for k in range(length):
+        if buf[pos + k] != marker[k]:
+            return False
+    return True
+
+
+def _find_marker(buf, start, end, marker, length):
+    for pos in range(start, end - length + 1):
+        hit = True
+        for k in range(length):
+            if buf[pos + k] != marker[k]:
+                hit = False
+                break
+        if hit:
+            return pos
+    return -1
+
+
+def _skip_space_then_word(buf, pos, end):
+    """Position of the word character after `\\s+`, or -1 on no match"""
+    if pos >= end or not _is_space(buf[pos]):
+        return -1
+    while pos < end and _is_space(buf[pos]):
+        pos += 1
+    if pos < end and _is_word(buf[pos]):
+        return pos
+    return -1
+
+
+def _match_from_import(buf, start, end):
+    """Matches `from\\s+\\w+\\s+import\\s+\\w`, the from-clause form of the
+    import regex; relative and dotted modules fall through like the regex"""
+    if (start + 4 > end or buf[start] != 102 or buf[start + 1] != 114
+            or buf[start + 2] != 111 or buf[start + 3] != 109):
+        return False
+    pos = _skip_space_then_word(buf, start + 4, end)
+    if pos < 0:
+        return False
+    while pos < end and _is_word(buf[pos]):
+        pos += 1
+    if pos >= end or not _is_space(buf[pos]):
+        return False
+    while pos < end and _is_space(buf[pos]):
+        pos += 1
+    if (pos + 6 > end or buf[pos] != 105 or buf[pos + 1] != 109
+            or buf[pos + 2] != 112 or buf[pos + 3] != 111
+            or buf[pos + 4] != 114 or buf[pos + 5] != 116):
+        return False
+    return _skip_space_then_word(buf, pos + 6, end) >= 0
+
+
+def _count_buffer(buf, sl_table, sl_lens, mls_table, mls_lens, mle_table,
+                  mle_lens, cls_table, cls_lens, cls_cat, cls_ws,
+                  from_cat, var_cat, other_cat, ncat):
+    blank = 0
+    comments = 0
+    code = 0
+    total = 0
+    detailed = np.zeros(ncat, dtype=np.int64)
+    in_comment = False
+    end_marker = -1
+
+    size = buf.shape[0]
+    line_start = 0
+    while line_start < size:
+        line_end = line_start
+        while line_end < size and buf[line_end] != 10:
+            line_end += 1
+
+        # First and last non-whitespace positions on the line
+        first = line_start
+        while first < line_end and _is_space(buf[first]):
+            first += 1
+
+        total += 1
+        if first == line_end:
+            blank += 1
+        elif in_comment:
+            comments += 1
+            if _find_marker(buf, line_start, line_end,
+                            mle_table[end_marker], mle_lens[end_marker]) >= 0:
+                in_comment = False
+        else:
+            is_comment = False
+            for i in range(sl_lens.shape[0]):
+                if _matches_at(buf, first, line_end, sl_table[i], sl_lens[i]):
+                    is_comment = True
+                    break
+            if not is_comment:
+                for i in range(mls_lens.shape[0]):
+                    idx = _find_marker(buf, line_start, line_end,
+                                       mls_table[i], mls_lens[i])
+                    if idx >= 0:
+                        if _find_marker(buf, idx + mls_lens[i], line_end,
+                                        mle_table[i], mle_lens[i]) >= 0:
+                            # Complete inline comment: comment only when
+                            # nothing but whitespace precedes it
+                            is_comment = idx == first
+                        else:
+                            in_comment = True
+                            end_marker = i
+                            is_comment = True
+                        break
+            if is_comment:
+                comments += 1
+            else:
+                code += 1
+                category = -1
+                for i in range(cls_lens.shape[0]):
+                    pos = first if cls_ws[i] else line_start
+                    # Keyword prefix plus the `\s+\w` the regexes require
+                    if (_matches_at(buf, pos, line_end, cls_table[i],
+                                    cls_lens[i])
+                            and _skip_space_then_word(
+                                buf, pos + cls_lens[i], line_end) >= 0):
+                        category = cls_cat[i]
+                        break
+                if (category < 0 and from_cat >= 0
+                        and _match_from_import(buf, line_start, line_end)):
+                    category = from_cat
+                if category < 0 and var_cat >= 0:
+                    c = buf[first]
+                    if (65 <= c <= 90) or (97 <= c <= 122) or c == 95:
+                        pos = first + 1
+                        while pos < line_end:
+                            c = buf[pos]
+                            if ((48 <= c <= 57) or (65 <= c <= 90)
+                                    or (97 <= c <= 122) or c == 95):
+                                pos += 1
+                            else:
+                                break
+                        while pos < line_end and _is_space(buf[pos]):
+                            pos += 1
+                        if pos < line_end and buf[pos] == 61:
+                            category = var_cat
+                if category < 0:
+                    category = other_cat
+                detailed[category] += 1
+
+        line_start = line_end + 1
+
+    return blank, comments, code, total, detailed
+
+
+if njit is not None:
+    _is_space = njit(cache=True, inline='always')(_is_space)
+    _is_word = njit(cache=True, inline='always')(_is_word)
+    _matches_at = njit(cache=True, inline='always')(_matches_at)
+    _find_marker = njit(cache=True)(_find_marker)
+    _skip_space_then_word = njit(cache=True)(_skip_space_then_word)
+    _match_from_import = njit(cache=True)(_match_from_import)
+    _count_buffer = njit(cache=True)(_count_buffer)
+
+
+def _get_tables(language_config: Dict[str, Any]) -> Tuple:
+    name = language_config['name']
+    tables = _TABLE_CACHE.get(name)
+    if tables is None:
+        prefixes = _LANGUAGE_PREFIXES[name]
+        categories = list(language_config.get('patterns', {})) + ['other_code']
+        index = {category: i for i, category in enumerate(categories)}
+        sl_table, sl_lens = _pad(
+            [c.encode() for c in language_config['single_line_comments']])
+        mls_table, mls_lens = _pad(
+            [s.encode() for s, _ in language_config['multi_line_comments']])
+        mle_table, mle_lens = _pad(
+            [e.encode() for _, e in language_config['multi_line_comments']])
+        cls_table, cls_lens = _pad([p for p, _, _ in prefixes])
+        cls_cat = np.array([index[cat] for _, cat, _ in prefixes],
+                           dtype=np.int64)
+        cls_ws = np.array([ws for _, _, ws in prefixes], dtype=np.bool_)
+        from_cat = (index[_FROM_IMPORT_LANGUAGES[name]]
+                    if name in _FROM_IMPORT_LANGUAGES else -1)
+        var_cat = (index['variable_declaration']
+                   if name in _VARIABLE_SCAN_LANGUAGES else -1)
+        tables = (categories, sl_table, sl_lens, mls_table, mls_lens,
+                  mle_table, mle_lens, cls_table, cls_lens, cls_cat, cls_ws,
+                  from_cat, var_cat, index['other_code'], len(categories))
+        _TABLE_CACHE[name] = tables
+    return tables
+
+
+def count_buffer(buf, language_config: Dict[str, Any]) -> Optional[Dict]:
+    """Count a whole file's bytes (e.g. an mmap) in one JIT-compiled scan"""
+    if not supports(language_config):
+        return None
+    categories, *tables = _get_tables(language_config)
+    blank, comments, code, total, detailed = _count_buffer(
+        np.frombuffer(buf, dtype=np.uint8), *tables)
+    stats = {
+        'blank': int(blank),
+        'comments': int(comments),
+        'code': int(code),
+        'total': int(total),
+        'detailed': {category: int(count)
+                     for category, count in zip(categories, detailed)
+                     if count},
+    }
+    if blank:
+        stats['detailed']['blank'] = int(blank)
+    if comments:
+        stats['detailed']['comments'] = int(comments)
+    return stats
@@ -0,0 +1,11 @@
+"""Builds the optional Cython extension for the hot line-counting loop.
+
+Usage: python setup.py build_ext --inplace
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='code-analyser',
+    ext_modules=cythonize('line_counter.pyx', language_level=3),
+)